@@ -5,17 +5,16 @@
 #   - Option 3: Check Sensors (temp/humid/light/rain)
 #   - Alarm monitor: blocks UI if alarm modal is triggered
 
-import time
-import queue
+import asyncio
 
-import g  as g# shared: lcd, shared_keypad_queue, current_page, idle_menu, PAGES, etc.
+import g  as g# shared: lcd, ui_queue/next_key, current_page, idle_menu, PAGES, etc.
 
 # Engine controls (F3/F4)
 from F3_4_start_stop_engine import (
     toggle_engine,
-    enforce_switch_safety,
     stop_engine,
     is_engine_running,
+    STOPPED_HOLD_S,
 )
 
 # F2: Door lock/unlock (servo)
@@ -28,110 +27,145 @@ import F5_environment_monitor as sensors
 import F9_Intruder_detect as alarm
 
 # ---------- Initialize modules that render to LCD / use shared config ----------
-door.init(
-    lock_angle=g.lock_angle,
-    unlock_angle=g.unlock_angle,
-    default_state=("locked" if g.locked else "unlocked"),
-)
+def bootstrap():
+    """Hardware init for door, sensors and alarm. Call once from the launcher, not at import."""
+    door.init(
+        lock_angle=g.lock_angle,
+        unlock_angle=g.unlock_angle,
+        default_state=("locked" if g.state.locked else "unlocked"),
+    )
+
+    sensors.init(
+        dark_threshold=g.sensors_dark_threshold,
+        light_channel=g.sensors_light_channel,
+    )
+
+    # Alarm uses g.rfid_allowed_uids if present
+    try:
+        alarm.init(allowed_uids=g.rfid_allowed_uids)
+    except Exception:
+        alarm.init(allowed_uids=None)
 
-sensors.init(
-    dark_threshold=g.sensors_dark_threshold,
-    light_channel=g.sensors_light_channel,
-)
+# ---------- UI helpers ----------
+def _lcd_label(text):
+    """Constant label as LCD-ready bytes, cut/padded to the 16-char line."""
+    return text[:16].ljust(16).encode("ascii")
 
-# Alarm init typically done in integrator too; harmless here
-try:
-    alarm.init(allowed_uids=g.rfid_allowed_uids)
-except Exception:
-    alarm.init(allowed_uids=None)
+# Built once at import; the LCD writer sends these without per-draw conversion
+_MAIN_MENU = (_lcd_label("1. Initialize"), _lcd_label("2. Lock/Unlock"))
+_MENU_PAGES = [tuple(_lcd_label(s) for s in pair) for pair in g.idle_menu]
 
-# ---------- UI helpers ----------
 def show_main_menu():
-    g.lcd.lcd_clear()
-    g.lcd.lcd_display_string("1. Initialize", 1)
-    g.lcd.lcd_display_string("2. Lock/Unlock", 2)
+    g.lcd_post(*_MAIN_MENU)
 
 def show_idle_menu():
-    g.lcd.lcd_clear()
-    top, bottom = g.idle_menu[g.current_page]
-    g.lcd.lcd_display_string(top, 1)
-    g.lcd.lcd_display_string(bottom, 2)
+    top, bottom = _MENU_PAGES[g.current_page]
+    g.lcd_post(top, bottom)
+
+# ---------- Message holds ----------
+# A status message stays up until its deadline, then the idle menu redraws
+# itself; keys and events keep being handled meanwhile.
+_redraw_handle = None   # asyncio TimerHandle for the pending redraw, or None
+
+def _redraw_idle():
+    global _redraw_handle
+    _redraw_handle = None
+    if not g.state.alarm_active:
+        show_idle_menu()
+
+def _hold_then_redraw(hold_s):
+    """Keep the current message for hold_s seconds, then redraw the idle menu."""
+    global _redraw_handle
+    _cancel_redraw()
+    _redraw_handle = asyncio.get_running_loop().call_later(hold_s, _redraw_idle)
+
+def _cancel_redraw():
+    """Drop a pending redraw. Returns True if one was pending."""
+    global _redraw_handle
+    if _redraw_handle is None:
+        return False
+    _redraw_handle.cancel()
+    _redraw_handle = None
+    return True
 
 # ---------- Idle menu loop ----------
-def idle_menu_loop():
+async def idle_menu_loop():
+    """Idle menu; sleeps until a key or g.EVT_* event arrives (run inside Integrate's loop)."""
+    try:
+        await _idle_menu_loop()
+    finally:
+        _cancel_redraw()
+
+async def _idle_menu_loop():
+    # Bound once: these are used on every key
+    next_key = g.next_key
+    state = g.state
+    pages = g.PAGES
+    evt_alarm_cleared = g.EVT_ALARM_CLEARED
+    evt_safety_stop = g.EVT_SAFETY_STOP
+
     show_idle_menu()
 
     while True:
-        # 1) Safety: stop engine if slide switch flips OFF
-        if enforce_switch_safety()==False:
+        key = await next_key()
+
+        # Any key/event ends a message hold early (the alarm screen stays up)
+        if _cancel_redraw() and not state.alarm_active:
             show_idle_menu()
 
-        # 2) Alarm monitoring: if door locked and IR changes, this will
-        #    ENTER a MODAL loop and only return after RFID clears the alarm.
-        alarm.monitor_ir_and_trigger()
-
-        # If alarm is active, drain keys & wait
-        if getattr(g, "alarm_active", False):
-            try:
-                while True:
-                    g.shared_keypad_queue.get_nowait()
-            except queue.Empty:
-                pass
-            time.sleep(0.05)
-            continue  # modal alarm still owns control
-        
-        if getattr(g, "return_to_main_menu", False):
-            g.return_to_main_menu = False
+        # Alarm cleared (or cleared earlier): back to the main menu
+        if key == evt_alarm_cleared or state.return_to_main_menu:
+            state.return_to_main_menu = False
             return
-        
-        # 3) UI input
-        try:
-            key = g.shared_keypad_queue.get(timeout=0.1)
-        except queue.Empty:
+
+        # Safety: the slide switch flipped OFF and the engine was stopped
+        if key == evt_safety_stop:
+            if not state.alarm_active:
+                g.lcd_post("Engine stopped")
+                _hold_then_redraw(STOPPED_HOLD_S)
             continue
 
+        # Modal alarm owns control: discard keys
+        if state.alarm_active:
+            g.drain_keys()
+            continue
+
+        page = g.current_page
         if key == '*':
-            g.current_page = (g.current_page - 1) % g.PAGES
+            g.current_page = (page - 1) % pages
             show_idle_menu()
 
         elif key == '#':
-            g.current_page = (g.current_page + 1) % g.PAGES
+            g.current_page = (page + 1) % pages
             show_idle_menu()
 
-        elif key == '1' and g.current_page == 0:
+        elif key == '1' and page == 0:
             # F3/F4: Start/Stop Engine
-            toggle_engine()
-            time.sleep(1.0)  # allow engine status to show
-            show_idle_menu()
+            await g.run_blocking(toggle_engine)
+            _hold_then_redraw(1.0)  # allow engine status to show
 
-        elif key == '2' and g.current_page == 0:
-            # F2: Lock/Unlock Door (servo) — this also updates g.locked
-            door.toggle_lock()
-            time.sleep(0.2)
-            show_idle_menu()
+        elif key == '2' and page == 0:
+            # F2: Lock/Unlock Door (servo) — this also updates g.state.locked
+            await g.run_blocking(door.toggle_lock)
+            _hold_then_redraw(0.2)
 
-        elif key == '3' and g.current_page == 1:
+        elif key == '3' and page == 1:
             # Check Sensors (3 screens ~6s total)
-            sensors.display_all(duration_s=2.0)
+            await g.run_blocking(sensors.display_all, 2.0)
             show_idle_menu()
 
-        elif key == '4' and g.current_page == 1:
-            g.lcd.lcd_clear()
-            g.lcd.lcd_display_string("Init Mobile Conn", 1)
-            time.sleep(1.2)
-            show_idle_menu()
+        elif key == '4' and page == 1:
+            g.lcd_post("Init Mobile Conn")
+            _hold_then_redraw(1.2)
 
-        elif key == '5' and g.current_page == 2:
-            g.lcd.lcd_clear()
-            g.lcd.lcd_display_string("Low Power Mode", 1)
-            time.sleep(1.0)
-            show_idle_menu()
+        elif key == '5' and page == 2:
+            g.lcd_post("Low Power Mode")
+            _hold_then_redraw(1.0)
 
-        elif key == '6' and g.current_page == 2:
-            g.lcd.lcd_clear()
-            g.lcd.lcd_display_string("Powering Off", 1)
+        elif key == '6' and page == 2:
+            g.lcd_post("Powering Off")
             if is_engine_running():
-                stop_engine()
-                time.sleep(0.5)
-            g.lcd.lcd_clear()
+                await g.run_blocking(stop_engine)
+                await asyncio.sleep(0.5)
+            g.lcd_post()
             return  # exit back to main menu
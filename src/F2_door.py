@@ -23,25 +23,29 @@ def _clamp_angle(a):
     return max(0.0, min(180.0, a))
 
 def _apply_servo(angle=None, settle_s=0.2):
-    """Send the servo to the desired angle."""
+    """Send the servo to the desired angle (no-op if it is already there)."""
     if angle is None:
-        angle = g.lock_angle if g.locked else g.unlock_angle
+        angle = g.lock_angle if g.state.locked else g.unlock_angle
     angle = _clamp_angle(angle)
+    last = g.state.last_servo_angle
+    if last is not None and abs(angle - last) < 0.5:
+        return  # already at target: skip the move and the settle wait
     try:
         hal_servo.set_servo_position(angle)
+        g.state.last_servo_angle = angle
     except Exception as e:
         # Keep UI responsive even if servo errors
+        g.state.last_servo_angle = None
         _lcd_lines(("Servo error", str(e)))
     time.sleep(settle_s)
 
 def _lcd_lines(lines, hold_s=1.0):
-    """Safe LCD drawing using shared g.lcd; lines is tuple/list of up to 2 strings."""
+    """Post a frame to the shared LCD worker; lines is tuple/list of up to 2 strings."""
     try:
-        g.lcd.lcd_clear()
-        if len(lines) > 0 and lines[0]:
-            g.lcd.lcd_display_string(str(lines[0]), 1)
-        if len(lines) > 1 and lines[1]:
-            g.lcd.lcd_display_string(str(lines[1]), 2)
+        g.lcd_post(
+            lines[0] if len(lines) > 0 else "",
+            lines[1] if len(lines) > 1 else "",
+        )
     except Exception:
         # If LCD not available, just skip
         pass
@@ -59,8 +63,6 @@ def init(lock_angle=0, unlock_angle=90, default_state="locked"):
     hal_servo.init()
 
     # Create shared fields in g if missing
-    if not hasattr(g, "locked"):
-        g.locked = True
     if not hasattr(g, "lock_angle"):
         g.lock_angle = 0.0
     if not hasattr(g, "unlock_angle"):
@@ -68,22 +70,22 @@ def init(lock_angle=0, unlock_angle=90, default_state="locked"):
 
     g.lock_angle = _clamp_angle(lock_angle)
     g.unlock_angle = _clamp_angle(unlock_angle)
-    g.locked = (str(default_state).lower() == "locked")
+    g.state.locked = (str(default_state).lower() == "locked")
 
     # Move to default state
     _apply_servo()
-    _lcd_lines(("Door " + ("Locked" if g.locked else "Unlocked"), ""), hold_s=0.6)
+    _lcd_lines(("Door " + ("Locked" if g.state.locked else "Unlocked"), ""), hold_s=0.6)
 
 def lock(show_ui=True):
     """Lock the door (move servo to lock angle)."""
-    g.locked = True
+    g.state.locked = True
     _apply_servo()
     if show_ui:
         _lcd_lines(("Door Locked", ""), hold_s=0.8)
 
 def unlock(show_ui=True):
     """Unlock the door (move servo to unlock angle)."""
-    g.locked = False
+    g.state.locked = False
     _apply_servo()
     if show_ui:
         _lcd_lines(("Door Unlocked", ""), hold_s=0.8)
@@ -97,7 +99,7 @@ def toggle_lock(show_ui=True):
 
 def is_locked():
     """Return True if the door is currently locked."""
-    return bool(getattr(g, "locked", True))
+    return bool(g.state.locked)
 
 def set_angles(lock_angle, unlock_angle, show_ui=True):
     """
@@ -4,20 +4,35 @@
 # At launch: provide helper to ensure slide switch is OFF before UI begins.
 
 import time
+import threading
 from hal import hal_dc_motor
-from hal import hal_rfid_reader
-from hal import hal_lcd
 from hal import hal_input_switch
 import g as g
+from F7_auth_service import normalize_uids
 
 # Module-level state
 _engine_running = False
+_engine_lock = threading.Lock()   # motor + _engine_running change together (UI and GPIO threads)
 _require_rfid_each_start = True
 _allowed_uids = None
+RFID_AUTH_TIMEOUT_S = 30.0        # give up on "Tap RFID Card" after this long
 
-# HAL objects (set in init())
-rfid = None
-lcd = None
+# How long each status message stays on the LCD (seconds)
+SWITCH_OK_HOLD_S = 0.8
+GRANTED_HOLD_S = 0.6
+DENIED_HOLD_S = 0.9
+STOPPED_HOLD_S = 1.0
+
+# Slide switch edge events (set by _on_switch_edge from the GPIO callback thread)
+SWITCH_RECHECK_S = 1.0            # safety re-read in case an edge is lost to bounce
+SWITCH_BOUNCE_S = 0.03            # just past the HAL's 20 ms bouncetime
+_switch_irq = False               # True once edge detection is armed
+_switch_edge = threading.Event()  # set on every switch edge
+
+# Slide switch read cache: callers within SWITCH_CACHE_S share one GPIO read
+SWITCH_CACHE_S = 0.02
+_switch_read_ts = 0.0             # time.monotonic() of the last real read (0 = invalid)
+_switch_read_val = 0
 
 def init(require_rfid_each_start=True, allowed_uids=None):
     """
@@ -25,20 +40,69 @@ def init(require_rfid_each_start=True, allowed_uids=None):
       - require_rfid_each_start: if True, user must tap a card on every Start.
       - allowed_uids: iterable of allowed UIDs (ints or strings). If None, any UID is accepted.
     """
-    global rfid, lcd, _require_rfid_each_start, _allowed_uids
+    global _require_rfid_each_start, _allowed_uids, _switch_irq
     hal_dc_motor.init()
-    hal_input_switch.init()
-    rfid = hal_rfid_reader.init()   # SimpleMFRC522
-    lcd = hal_lcd.lcd()
+    try:
+        hal_input_switch.init(_on_switch_edge)
+        _switch_irq = True
+    except Exception:
+        # Edge detection unavailable: fall back to polling in the waits below
+        hal_input_switch.init()
+        _switch_irq = False
+    g.start_rfid_reader()   # shared reader daemon (see g.wait_rfid)
     _require_rfid_each_start = bool(require_rfid_each_start)
-    _allowed_uids = set(allowed_uids) if allowed_uids else None
+    # Canonical int UIDs only, so each tap is a single membership test
+    if allowed_uids:
+        _allowed_uids = normalize_uids(allowed_uids)
+    else:
+        _allowed_uids = None
 
 def is_engine_running():
     return _engine_running
 
 def read_slide_switch():
-    """Return 1 if ON, 0 if OFF."""
-    return hal_input_switch.read_slide_switch()
+    """Return 1 if ON, 0 if OFF. Reads within SWITCH_CACHE_S of the last one reuse it."""
+    global _switch_read_ts, _switch_read_val
+    now = time.monotonic()
+    if now - _switch_read_ts < SWITCH_CACHE_S:
+        return _switch_read_val
+    _switch_read_val = hal_input_switch.read_slide_switch()
+    _switch_read_ts = now
+    return _switch_read_val
+
+def _cut_engine():
+    """Motor off and mark stopped, without any LCD hold. Returns True if it was running."""
+    global _engine_running
+    with _engine_lock:
+        if not _engine_running:
+            return False
+        hal_dc_motor.set_motor_speed(0)
+        _engine_running = False
+        return True
+
+def _recheck_switch():
+    """Re-read the switch: wake waiters; cut the engine if it is OFF. Never sleeps."""
+    global _switch_read_ts
+    _switch_read_ts = 0.0  # the cached level is stale now
+    _switch_edge.set()
+    if _engine_running and read_slide_switch() == 0 and _cut_engine():
+        g.post_event(g.EVT_SAFETY_STOP)  # the UI shows "Engine stopped"
+
+def _on_switch_edge(channel):
+    """GPIO edge callback (RPi.GPIO's shared callback thread, so it must not block)."""
+    _recheck_switch()
+    # The read above can land mid-bounce, and bouncetime may swallow the final
+    # settling edge: look once more after the bounce window has passed.
+    threading.Timer(SWITCH_BOUNCE_S, _recheck_switch).start()
+
+def _wait_for_switch(want):
+    """Sleep until the slide switch reads `want` (woken by the edge callback)."""
+    wait_s = SWITCH_RECHECK_S if _switch_irq else 0.1
+    while not g.shutdown_event.is_set():  # give up within wait_s on shutdown
+        _switch_edge.clear()   # clear before reading so an edge in between isn't lost
+        if read_slide_switch() == want:
+            return
+        _switch_edge.wait(wait_s)
 
 def ensure_switch_off_at_launch():
     """
@@ -47,34 +111,34 @@ def ensure_switch_off_at_launch():
     """
     if read_slide_switch() == 0:
         return
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Turn slide switch", 1)
-    lcd.lcd_display_string("OFF to begin", 2)
-    while read_slide_switch() != 0:
-        time.sleep(0.1)
-    lcd.lcd_clear()
-    lcd.lcd_display_string("OK: Switch OFF", 1)
-    time.sleep(0.8)
-    lcd.lcd_clear()
+    g.lcd_post("Turn slide switch", "OFF to begin")
+    _wait_for_switch(0)
+    g.lcd_post("OK: Switch OFF")
+    time.sleep(SWITCH_OK_HOLD_S)
+    g.lcd_post()
 
 def _authenticate_rfid():
-    """Blocks until a card is tapped; True if allowed (or open)."""
+    """Blocks until a card is tapped (or RFID_AUTH_TIMEOUT_S); True if allowed (or open)."""
     if not _require_rfid_each_start:
         return True
 
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Tap RFID Card", 1)
-    uid = rfid.read_id()  # blocks until card tapped (int UID)
+    g.lcd_post("Tap RFID Card")
+    uid = g.wait_rfid(timeout=RFID_AUTH_TIMEOUT_S)  # reader daemon sleeps on the IRQ line
+    if g.shutdown_event.is_set():
+        return False
+    if uid is None:
+        g.lcd_post("No card read")
+        time.sleep(DENIED_HOLD_S)
+        return False
 
-    if _allowed_uids is None or (uid in _allowed_uids) or (str(uid) in _allowed_uids):
-        lcd.lcd_clear()
-        lcd.lcd_display_string("Access Granted", 1)
-        time.sleep(0.6)
+    # _allowed_uids holds canonical int UIDs (see init()), and read UIDs are ints
+    if _allowed_uids is None or uid in _allowed_uids:
+        g.lcd_post("Access Granted")
+        time.sleep(GRANTED_HOLD_S)
         return True
     else:
-        lcd.lcd_clear()
-        lcd.lcd_display_string("Access denied", 1)
-        time.sleep(0.9)
+        g.lcd_post("Access denied")
+        time.sleep(DENIED_HOLD_S)
         return False
 
 def _wait_for_switch_on():
@@ -84,11 +148,8 @@ def _wait_for_switch_on():
     """
     if read_slide_switch() == 1:
         return
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Turn slide switch", 1)
-    lcd.lcd_display_string("ON to start", 2)
-    while read_slide_switch() != 1:
-        time.sleep(0.1)
+    g.lcd_post("Turn slide switch", "ON to start")
+    _wait_for_switch(1)
 
 def start_engine():
     """
@@ -108,26 +169,23 @@ def start_engine():
 
     # 2) Then wait for switch to be ON
     _wait_for_switch_on()
+    if g.shutdown_event.is_set():
+        return False  # the wait was abandoned, not satisfied
 
     # 3) Start motor
-    hal_dc_motor.set_motor_speed(100)
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Engine started", 1)
-    lcd.lcd_display_string("Drive safely", 2)
-    _engine_running = True
+    with _engine_lock:
+        hal_dc_motor.set_motor_speed(100)
+        _engine_running = True
+    g.lcd_post("Engine started", "Drive safely")
     return True
 
 def stop_engine():
     """Stop the motor and update display. Always returns True."""
-    global _engine_running
-    if not _engine_running:
+    if not _cut_engine():
         return True
 
-    hal_dc_motor.set_motor_speed(0)
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Engine stopped", 1)
-    time.sleep(1.0)
-    _engine_running = False
+    g.lcd_post("Engine stopped")
+    time.sleep(STOPPED_HOLD_S)
     return True
 
 def toggle_engine():
@@ -141,14 +199,21 @@ def toggle_engine():
 def enforce_switch_safety():
     """
     Call this periodically from your UI loop.
-    If the slide switch turns OFF while running, stop the engine.
+    If the slide switch turns OFF while running, stop the engine (no LCD hold;
+    the caller shows "Engine stopped", e.g. via g.EVT_SAFETY_STOP).
     Returns False if it had to stop the engine, True otherwise.
+    With edge detection armed this is the backstop for a lost edge.
     """
-    if _engine_running and read_slide_switch() == 0:
-        stop_engine()
+    if not _engine_running:
+        return True  # nothing to protect; skip the GPIO read
+    if read_slide_switch() == 0 and _cut_engine():
         return False
     return True
 
+def switch_irq_active():
+    """True if slide switch edges are interrupt-driven (no polling needed)."""
+    return _switch_irq
+
 def cleanup():
     """Optional: call on program exit."""
     try:
@@ -156,6 +221,6 @@ def cleanup():
     except Exception:
         pass
     try:
-        lcd.lcd_clear()
+        g.lcd_post()
     except Exception:
         pass
\ No newline at end of file
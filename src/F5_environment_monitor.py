@@ -8,6 +8,8 @@
 #   - Simple setters for threshold/channel/invert, and a quick calibration helper
 
 import time
+import threading
+import statistics
 from typing import Optional, Tuple
 
 import g  # shared: lcd + config fields
@@ -21,6 +23,20 @@ DFLT_DARK_THRESHOLD = 500    # MCP3008 scale: 0..1023
 DFLT_LIGHT_CHANNEL  = 0      # MCP3008 channel for the LDR
 DFLT_INVERT_DARK    = False  # If True, DARK means value < threshold
 LED_INDEX_LIGHT     = 0      # HAL ignores index; kept for readability
+_NA                 = "N/A"  # shown for missing/invalid readings
+LIGHT_CACHE_TTL_S   = 0.25   # reuse a light reading this fresh instead of a new SPI read
+DHT_REFRESH_S       = 2.0    # background DHT11 sample period (sensor max ~1 Hz)
+DHT_STALE_S         = 5.0    # cached temp/humid older than this reads as N/A
+
+# Active light settings. Module-local copies of g.sensors_* so the hot paths
+# skip getattr()/int()/bool(); only the setters below write them (and g.*).
+_DARK_THR = DFLT_DARK_THRESHOLD
+_LIGHT_CH = DFLT_LIGHT_CHANNEL
+_INVERT   = DFLT_INVERT_DARK
+
+# DHT11 background sampler
+_dht_lock = threading.Lock()
+_dht_thread = None
 
 # ---------- init ----------
 def init(
@@ -31,78 +47,113 @@ def init(
     """
     One-time hardware init + shared-state bootstrap.
     Stores calibration & last-read values into g.*
+    Starts the DHT11 background sampler (daemon thread).
     """
+    global _dht_thread
     led.init()
     adc.init()
     temp_humid_sensor.init()
     moisture_sensor.init()
 
-    setattr(g, "sensors_dark_threshold", int(dark_threshold))
-    setattr(g, "sensors_light_channel", int(light_channel))
-    setattr(g, "sensors_dark_invert", bool(invert_dark))
+    set_dark_threshold(dark_threshold)
+    set_light_channel(light_channel)
+    set_invert_dark(invert_dark)
 
-    # Last reading caches in g (for other modules to reuse if desired)
-    for name, default in (
-        ("last_temp",  None),
-        ("last_humid", None),
-        ("last_light", None),
-        ("last_rain",  None),  # bool: True=raining, False=not raining, None=unknown
-    ):
-        if not hasattr(g, name):
-            setattr(g, name, default)
+    if _dht_thread is None:
+        _dht_thread = threading.Thread(target=_dht_refresh_loop, daemon=True)
+        _dht_thread.start()
 
 # ---------- config setters (optional utilities) ----------
 def set_dark_threshold(th: int) -> None:
-    setattr(g, "sensors_dark_threshold", int(th))
+    global _DARK_THR
+    _DARK_THR = g.sensors_dark_threshold = int(th)
 
 def set_light_channel(ch: int) -> None:
-    setattr(g, "sensors_light_channel", int(ch))
+    global _LIGHT_CH
+    _LIGHT_CH = g.sensors_light_channel = int(ch)
 
 def set_invert_dark(flag: bool) -> None:
-    setattr(g, "sensors_dark_invert", bool(flag))
+    global _INVERT
+    _INVERT = g.sensors_dark_invert = bool(flag)
 
 def quick_calibrate_dark_threshold(samples: int = 10, margin: int = 50) -> int:
     """
     Quickly calibrate threshold around current ambient light.
+    Uses the median of the samples, so one odd reading (shadow, flicker) doesn't skew it.
     Returns the threshold chosen and stores it in g.sensors_dark_threshold.
     """
+    get_adc_value = adc.get_adc_value
+    ch = _LIGHT_CH
     vals = []
     for _ in range(max(1, samples)):
-        v = read_light_level()
-        if v >= 0:
+        try:
+            v = int(get_adc_value(ch))
+        except Exception:
+            v = -1
+        if v >= 0:  # get_adc_value returns -1 for an invalid channel
             vals.append(v)
         time.sleep(0.02)
     if not vals:
-        return int(getattr(g, "sensors_dark_threshold", DFLT_DARK_THRESHOLD))
-    avg = sum(vals) // len(vals)
-    th = max(0, min(1023, avg + (margin if not getattr(g, "sensors_dark_invert", False) else -margin)))
+        return _DARK_THR
+    # Publish the last sample once, as read_light_level() would
+    g.state.last_light = vals[-1]
+    g.state.last_light_ts = time.monotonic()
+    mid = int(statistics.median(vals))
+    th = max(0, min(1023, mid + (-margin if _INVERT else margin)))
     set_dark_threshold(th)
     return th
 
 # ---------- low-level reads ----------
-def read_light_level() -> int:
-    """Read ambient light from ADC channel set in g.sensors_light_channel. Returns 0..1023, or -1 on error."""
-    ch = int(getattr(g, "sensors_light_channel", DFLT_LIGHT_CHANNEL))
+def read_light_level(force: bool = False) -> int:
+    """
+    Read ambient light from the configured ADC channel (_LIGHT_CH). Returns 0..1023, or -1 on error.
+    A valid reading younger than LIGHT_CACHE_TTL_S is reused unless force=True.
+    """
+    now = time.monotonic()
+    last = g.state.last_light
+    if not force and last is not None and last >= 0 \
+            and now - g.state.last_light_ts < LIGHT_CACHE_TTL_S:
+        return last
+
     try:
-        val = int(adc.get_adc_value(ch))
+        val = int(adc.get_adc_value(_LIGHT_CH))
     except Exception:
         val = -1
-    g.last_light = val
+    g.state.last_light = val
+    g.state.last_light_ts = now
     return val
 
+def _sample_temp_humidity() -> None:
+    """One blocking DHT11 read; updates g.state.last_temp/g.state.last_humid only if valid."""
+    with _dht_lock:
+        try:
+            temp, humid = temp_humid_sensor.read_temp_humidity()  # [temp, humid] or [-100,-100]
+        except Exception:
+            return
+    if temp == -100 or humid == -100:
+        return
+    g.state.last_temp, g.state.last_humid = temp, humid
+    g.state.last_temp_ts = time.monotonic()
+
+def _dht_refresh_loop() -> None:
+    """Daemon: keep g.state.last_temp/g.state.last_humid fresh so readers never wait on the DHT11."""
+    while True:
+        _sample_temp_humidity()
+        time.sleep(DHT_REFRESH_S)
+
 def read_temp_humidity() -> Tuple[Optional[float], Optional[float]]:
     """
-    Read temperature & humidity from DHT11.
-    Returns (temp_c, humid_pct) as floats, or (None, None) if invalid.
+    Return the latest temperature & humidity from the background sampler (non-blocking).
+    Only blocks on the DHT11 if no valid sample exists yet.
+    Returns (temp_c, humid_pct) as floats, or (None, None) if never read
+    or if the last valid sample is older than DHT_STALE_S (sensor failing).
     """
-    try:
-        temp, humid = temp_humid_sensor.read_temp_humidity()  # [temp, humid] or [-100,-100]
-        if temp == -100 or humid == -100:
-            temp = humid = None
-    except Exception:
-        temp = humid = None
-    g.last_temp, g.last_humid = temp, humid
-    return temp, humid
+    if not g.state.last_temp_ts:
+        _sample_temp_humidity()
+    ts = g.state.last_temp_ts
+    if not ts or time.monotonic() - ts > DHT_STALE_S:
+        return None, None
+    return g.state.last_temp, g.state.last_humid
 
 def read_rain_status() -> Optional[bool]:
     """
@@ -112,7 +163,7 @@ def read_rain_status() -> Optional[bool]:
         raining = bool(moisture_sensor.read_sensor())
     except Exception:
         raining = None
-    g.last_rain = raining
+    g.state.last_rain = raining
     return raining
 
 # ---------- light decision ----------
@@ -122,53 +173,63 @@ def _is_dark(light_val: int, thr: int, invert: bool) -> bool:
     If invert is False: dark when light_val > thr (typical if LDR up = Vout increases in dark)
     If invert is True : dark when light_val < thr (typical if LDR down = Vout decreases in dark)
     """
-    if light_val < 0:
-        return False
-    return (light_val < thr) if invert else (light_val > thr)
+    return light_val >= 0 and ((light_val < thr) if invert else (light_val > thr))
 
 # ---------- UI helpers ----------
+# Screen templates (%-formatting; the N/A decision lives in _fmt_int_or_na)
+_FMT_AMB       = "Amb:%.1fC L:%s"
+_FMT_AMB_NA    = "Amb:" + _NA + "  L:%s"
+_FMT_HUMID     = "Humid:%.1f%%"
+_LINE_HUMID_NA = "Humid:" + _NA
+_FMT_LVL       = "Lvl:%s Th:%d"
+_LINE_RAIN_NA  = "Rain: " + _NA
+
+def _fmt_int_or_na(v: int) -> str:
+    """Reading as text, or N/A for the -1 error value."""
+    return str(v) if v >= 0 else _NA
+
 def _lcd_lines(line1: str = "", line2: str = "", hold_s: float = 0.0) -> None:
-    """Draw up to two lines on the shared LCD with an optional hold."""
+    """Post up to two lines to the shared LCD worker with an optional hold."""
     try:
-        g.lcd.lcd_clear()
-        if line1:
-            g.lcd.lcd_display_string(str(line1), 1)
-        if line2:
-            g.lcd.lcd_display_string(str(line2), 2)
+        g.lcd_post(line1, line2)
     except Exception:
         pass
     if hold_s > 0:
         time.sleep(hold_s)
 
 # ---------- screen flows (single-shot; no loops) ----------
-def show_environmental_data(duration_s: float = 2.0) -> None:
+# Each screen reads its own sensors unless pre-read values are passed in
+# (display_all() passes one _snapshot() to all three).
+def _snapshot():
+    """Read every sensor once: ((temp, humid), light_val, raining)."""
+    return read_temp_humidity(), read_light_level(), read_rain_status()
+
+def show_environmental_data(duration_s: float = 2.0, *, temp_humid=None, light_val=None) -> None:
     """
     Screen 1: Temperature/Humidity + Light level (or N/A if not available).
     """
-    temp, humid = read_temp_humidity()
-    light_val = read_light_level()
+    temp, humid = temp_humid if temp_humid is not None else read_temp_humidity()
+    if light_val is None:
+        light_val = read_light_level()
+    light_txt = _fmt_int_or_na(light_val)
 
     if temp is None or humid is None:
-        _lcd_lines(
-            line1=f"Amb:N/A  L:{light_val if light_val>=0 else 'N/A'}",
-            line2="Humid:N/A",
-            hold_s=duration_s,
-        )
+        line1 = _FMT_AMB_NA % light_txt
+        line2 = _LINE_HUMID_NA
     else:
-        _lcd_lines(
-            line1=f"Amb:{temp:.1f}C L:{light_val if light_val>=0 else 'N/A'}",
-            line2=f"Humid:{humid:.1f}%",
-            hold_s=duration_s,
-        )
+        line1 = _FMT_AMB % (temp, light_txt)
+        line2 = _FMT_HUMID % humid
+    _lcd_lines(line1=line1, line2=line2, hold_s=duration_s)
 
-def update_lighting(duration_s: float = 2.0) -> None:
+def update_lighting(duration_s: float = 2.0, *, light_val=None) -> None:
     """
     Screen 2: Determine darkness and drive LED.
-    Uses g.sensors_dark_threshold and g.sensors_dark_invert.
+    Uses the threshold/invert set via init() or the setters.
     """
-    light_val = read_light_level()
-    thr = int(getattr(g, "sensors_dark_threshold", DFLT_DARK_THRESHOLD))
-    invert = bool(getattr(g, "sensors_dark_invert", DFLT_INVERT_DARK))
+    if light_val is None:
+        light_val = read_light_level()
+    thr = _DARK_THR
+    invert = _INVERT
 
     is_dark = _is_dark(light_val, thr, invert)
 
@@ -182,31 +243,36 @@ def update_lighting(duration_s: float = 2.0) -> None:
     # Helpful debug on LCD: show raw level, threshold, and decision
     # e.g. "Lvl: 432 Th:500" and "Dark" / "Bright"
     _lcd_lines(
-        line1=(f"Lvl:{light_val if light_val>=0 else 'N/A'} Th:{thr}"),
+        line1=_FMT_LVL % (_fmt_int_or_na(light_val), thr),
         line2=("Dark" if is_dark else "Bright") + (" (inv)" if invert else ""),
         hold_s=duration_s,
     )
 
-def update_rain_status(duration_s: float = 2.0) -> None:
+_UNREAD = object()  # "raining" not passed (None already means a failed read)
+
+def update_rain_status(duration_s: float = 2.0, *, raining=_UNREAD) -> None:
     """
     Screen 3: Read moisture sensor; show rain status.
     """
-    raining = read_rain_status()
+    if raining is _UNREAD:
+        raining = read_rain_status()
     if raining is True:
         _lcd_lines("Rain Detected", "Wipers ON", hold_s=duration_s)
     elif raining is False:
         _lcd_lines("No Rain", "Wipers OFF", hold_s=duration_s)
     else:
-        _lcd_lines("Rain: N/A", "", hold_s=duration_s)
+        _lcd_lines(_LINE_RAIN_NA, "", hold_s=duration_s)
 
 def display_all(duration_s: float = 2.0) -> None:
     """
     Convenience: show all three screens in sequence once.
     Intended to be called from F1 idle menu option 3.
+    All sensors are read once up front, so the screens show the same instant.
     """
-    show_environmental_data(duration_s)
-    update_lighting(duration_s)
-    update_rain_status(duration_s)
+    temp_humid, light_val, raining = _snapshot()
+    show_environmental_data(duration_s, temp_humid=temp_humid, light_val=light_val)
+    update_lighting(duration_s, light_val=light_val)
+    update_rain_status(duration_s, raining=raining)
 
 # ---------- optional cleanup ----------
 def cleanup() -> None:
@@ -216,6 +282,6 @@ def cleanup() -> None:
     except Exception:
         pass
     try:
-        g.lcd.lcd_clear()
+        g.lcd_post()
     except Exception:
         pass
\ No newline at end of file
@@ -5,7 +5,7 @@ from threading import Thread
 from hal import hal_lcd as LCD
 from hal import hal_keypad as keypad
 
-shared_keypad_queue = queue.Queue()
+shared_keypad_queue = queue.SimpleQueue()
 
 def key_pressed(key):
     shared_keypad_queue.put(key)
@@ -17,13 +17,11 @@ idle_menu = [
 ]
 
 def show_idle_menu(lcd, page):
-    lcd.lcd_clear()
-    lcd.lcd_display_string(idle_menu[page][0], 1)
-    lcd.lcd_display_string(idle_menu[page][1], 2)
+    top, bottom = idle_menu[page]
+    lcd.lcd_write_screen(top, bottom)
 
 def simulate_mobile_app_connect(lcd):
-    lcd.lcd_clear()
-    lcd.lcd_display_string("Connecting...", 1)
+    lcd.lcd_write_screen("Connecting...", "")
     time.sleep(1)
 
     correct_username = "12345"
@@ -32,27 +30,19 @@ def simulate_mobile_app_connect(lcd):
     entered_password = "12345"
 
     if entered_username == correct_username and entered_password == correct_password:
-        lcd.lcd_clear()
-        lcd.lcd_display_string("Connected!", 1)
+        lcd.lcd_write_screen("Connected!", "")
         time.sleep(2)
 
-        lcd.lcd_clear()
-        lcd.lcd_display_string("1.Lock/Unlock", 1)
-        lcd.lcd_display_string("2.Climate Ctrl", 2)
+        lcd.lcd_write_screen("1.Lock/Unlock", "2.Climate Ctrl")
         time.sleep(2)
 
-        lcd.lcd_clear()
-        lcd.lcd_display_string("3.View Status", 1)
-        lcd.lcd_display_string("4.Manage User", 2)
+        lcd.lcd_write_screen("3.View Status", "4.Manage User")
         time.sleep(2)
 
-        lcd.lcd_clear()
-        lcd.lcd_display_string("Mobile Access:", 1)
-        lcd.lcd_display_string("Ready", 2)
+        lcd.lcd_write_screen("Mobile Access:", "Ready")
         time.sleep(2)
     else:
-        lcd.lcd_clear()
-        lcd.lcd_display_string("Auth Failed", 1)
+        lcd.lcd_write_screen("Auth Failed", "")
         time.sleep(2)
 
 def idle_menu_loop(lcd):
@@ -72,8 +62,7 @@ def idle_menu_loop(lcd):
             simulate_mobile_app_connect(lcd)
             show_idle_menu(lcd, current_page)
         elif key in ['1', '2', '3', '5', '6']:
-            lcd.lcd_clear()
-            lcd.lcd_display_string("Selected " + key, 1)
+            lcd.lcd_write_screen("Selected " + key, "")
             time.sleep(2)
             show_idle_menu(lcd, current_page)
         elif key in ['A', 'B', 'C', 'D']:
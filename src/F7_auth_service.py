@@ -6,58 +6,37 @@ import time
 from typing import Iterable, Optional, Tuple
 
 import g as g
-from hal import hal_rfid_reader
-from hal import hal_lcd as hal_lcd
-
-# Reader handle
-_reader = None
-
-# Direct LCD fallback (if someone calls before g.lcd exists)
-_LCD = None
 
 # ------------- helpers -------------
 def _ensure_reader():
-    global _reader
-    if _reader is None:
-        _reader = hal_rfid_reader.init()  # returns SimpleMFRC522
-
-def _ensure_lcd():
-    global _LCD
-    if _LCD is None:
-        try:
-            _LCD = hal_lcd.lcd()
-        except Exception:
-            _LCD = None
+    # One shared reader + daemon lives in g (see g.wait_rfid)
+    return g.start_rfid_reader()
 
 def _lcd(line1="", line2="", hold_s: float = 0.0):
-    # Prefer shared LCD in g (if present), else direct fallback
-    lcd = getattr(g, "lcd", None)
-    if lcd is None:
-        _ensure_lcd()
-        lcd = _LCD
-    if lcd is None:
-        if hold_s > 0:
-            time.sleep(hold_s)
-        return
+    # Post to the shared LCD worker (draws directly if it isn't running)
     try:
-        lcd.lcd_clear()
-        if line1:
-            lcd.lcd_display_string(str(line1), 1)
-        if line2:
-            lcd.lcd_display_string(str(line2), 2)
+        g.lcd_post(line1, line2)
     except Exception:
         pass
     if hold_s > 0:
         time.sleep(hold_s)
 
-def _normalize_uids(uids: Iterable) -> set:
+def to_uid(u) -> Optional[int]:
+    """Canonical int UID, or None if u isn't numeric (type checks, no exception path)."""
+    if isinstance(u, int):
+        return u
+    if isinstance(u, str) and u.isdecimal():
+        return int(u)
+    return None
+
+def normalize_uids(uids: Iterable) -> frozenset:
+    """Canonical int UIDs (MFRC522 UIDs are ints); non-numeric entries are dropped."""
     s = set()
     for u in (uids or []):
-        try:
-            s.add(int(u))
-        except Exception:
-            s.add(str(u))
-    return s
+        uid = to_uid(u)
+        if uid is not None:
+            s.add(uid)
+    return frozenset(s)
 
 # ------------- public API -------------
 def init(allowed_uids: Optional[Iterable] = None) -> None:
@@ -76,27 +55,17 @@ def init(allowed_uids: Optional[Iterable] = None) -> None:
     set_allowed(allowed_uids)
 
 def set_allowed(uids: Iterable) -> None:
-    """Replace the allowed UID set (updates g.rfid_allowed_uids)."""
-    s = _normalize_uids(uids)
-    # store both int & str forms for robust matching
-    both = set()
-    for u in s:
-        try:
-            both.add(int(u))
-        except Exception:
-            pass
-        both.add(str(u))
-    g.rfid_allowed_uids = list(both)
+    """Replace the allowed UID set (updates g.rfid_allowed_uids as a frozenset)."""
+    g.rfid_allowed_uids = normalize_uids(uids)  # ints only: one O(1) test per tap
 
 def is_allowed(uid) -> bool:
     """Check a UID against the current allowed set."""
-    allowed = getattr(g, "rfid_allowed_uids", None) or []
-    return (uid in allowed) or (str(uid) in allowed)
+    allowed = getattr(g, "rfid_allowed_uids", None) or frozenset()
+    return to_uid(uid) in allowed
 
 def read_id_blocking():
-    """Blocking read of the next RFID tap; returns the UID (int)."""
-    _ensure_reader()
-    return _reader.read_id()
+    """Blocking read of the next RFID tap; returns the UID (int), or None if no reader."""
+    return g.wait_rfid()
 
 def authorized_tap_blocking(
     prompt_line1: str = "Tap Authorized RFID",
@@ -107,13 +76,10 @@ def authorized_tap_blocking(
     Keep prompting until an allowed RFID is tapped.
     Returns (True, uid) on success. On unexpected reader error, returns (False, None).
     """
-    _ensure_reader()
-
     while True:
         _lcd(prompt_line1, prompt_line2, hold_s=0.0)
-        try:
-            uid = _reader.read_id()  # BLOCKS until a card is tapped
-        except Exception:
+        uid = g.wait_rfid()  # BLOCKS until the reader daemon publishes a tap
+        if uid is None:
             _lcd("RFID read error", "Try again", denied_hold_s)
             return (False, None)
 
@@ -1,28 +1,56 @@
 import csv
+import io
 import os
 
 CSV_FILE = "user_manage.csv"
 FIELDNAMES = ["RFID", "Username", "Password", "Phone", "Name", "LockPassword"]
 
+# Parsed CSV cache, keyed by the file's mtime (re-parsed only when it changes)
+_users_cache = None
+_users_mtime = 0
+_by_username = {}
+_by_rfid = {}
+
 def init_csv():
     """Ensure the CSV has headers."""
     if not os.path.exists(CSV_FILE):
-        with open(CSV_FILE, mode="w", newline="") as file:
+        with open(CSV_FILE, mode="w", newline="", encoding="utf-8") as file:
             writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
             writer.writeheader()
 
+def _set_cache(users, mtime):
+    """Store the parsed rows and rebuild the Username/RFID indexes."""
+    global _users_cache, _users_mtime, _by_username, _by_rfid
+    _users_cache = users
+    _users_mtime = mtime
+    _by_username = {u["Username"]: u for u in users}
+    _by_rfid = {u["RFID"]: u for u in users}
+
 def load_users():
-    """Load all users from the CSV file."""
+    """Load all users from the CSV file (cached until the file changes on disk)."""
     init_csv()
-    with open(CSV_FILE, mode="r", newline="") as file:
-        return list(csv.DictReader(file))
+    mtime = os.stat(CSV_FILE).st_mtime_ns
+    if _users_cache is None or mtime != _users_mtime:
+        with open(CSV_FILE, mode="r", newline="", encoding="utf-8") as file:
+            _set_cache(list(csv.DictReader(file)), mtime)
+    # Copies: callers may edit rows without touching the cache
+    return [dict(u) for u in _users_cache]
 
 def save_users(users):
-    """Save the entire list of users to the CSV."""
-    with open(CSV_FILE, mode="w", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        writer.writerows(users)
+    """Save the entire list of users to the CSV (one write, atomic replace)."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+    writer.writeheader()
+    writer.writerows(users)
+
+    tmp_file = CSV_FILE + ".tmp"
+    with open(tmp_file, mode="wb") as file:
+        file.write(buf.getvalue().encode("utf-8"))
+        file.flush()
+        os.fsync(file.fileno())  # data on disk before the rename makes it visible
+    os.replace(tmp_file, CSV_FILE)
+    # Refresh the cache so the next load is a hit (only reached if the save succeeded)
+    _set_cache([dict(u) for u in users], os.stat(CSV_FILE).st_mtime_ns)
 
 def add_user(rfid, username, password, phone, name, lock_password):
     """Add a new user if total users <= 3 and no duplicate RFID/Username."""
@@ -32,10 +60,9 @@ def add_user(rfid, username, password, phone, name, lock_password):
         print("User limit reached. Cannot add more than 3 users.")
         return False
 
-    for user in users:
-        if user["RFID"] == rfid or user["Username"] == username:
-            print("User already exists.")
-            return False
+    if username in _by_username or rfid in _by_rfid:
+        print("User already exists.")
+        return False
 
     users.append({
         "RFID": rfid,
@@ -51,10 +78,9 @@ def add_user(rfid, username, password, phone, name, lock_password):
 
 def find_user_by_username(username):
     """Find a user by username."""
-    for user in load_users():
-        if user["Username"] == username:
-            return user
-    return None
+    load_users()
+    user = _by_username.get(username)
+    return dict(user) if user is not None else None
 
 def update_user_field(username, field, new_value):
     """Update a specific field of a user."""
@@ -62,18 +88,13 @@ def update_user_field(username, field, new_value):
         print("Invalid field.")
         return False
 
-    users = load_users()
-    updated = False
-
+    users = load_users()  # copies, so a failed save leaves the cache untouched
     for user in users:
         if user["Username"] == username:
             user[field] = new_value
-            updated = True
-            break
-
-    if updated:
-        save_users(users)
-    return updated
+            save_users(users)
+            return True
+    return False
 
 def get_user_field(username, field):
     """Get the value of a specific field from a user."""
@@ -1,66 +1,64 @@
 # alarm_system.py
-# Modal alarm: triggers on a specific IR edge while the door is CLOSED (g.locked == True),
+# Modal alarm: triggers on a specific IR edge while the door is CLOSED (g.state.locked == True),
 # sounds buzzer continuously, and can ONLY be cleared via RFID.
 #
 # Public API:
 #   init(allowed_uids=None)
+#   set_trigger(edge="falling", hold_ms=60)
 #   monitor_ir_and_trigger()
-#   run_alarm_modal()
+#   run_alarm_modal()        (g.alarm_clear_event.set() cancels it from another thread)
 #
 # HALs used:
 #   IR     : hal_ir_sensor.get_ir_sensor_state() -> bool (True = object detected)
 #   Buzzer : hal_buzzer.turn_on() / turn_off()
-#   RFID   : hal_rfid_reader.init().read_id()
-#   LCD    : (via g.lcd_queue if present) or direct hal_lcd fallback
+#   RFID   : g.wait_rfid() (shared reader daemon in g.py)
+#   LCD    : g.lcd_post() -> shared LCD worker thread
 
 import time
-import queue
+import threading
 import Phone_noti
 import g as g
 import F1_menu as F1
+from F7_auth_service import to_uid, normalize_uids
 from hal import hal_ir_sensor as ir_sensor
 from hal import hal_buzzer as buzzer
-from hal import hal_rfid_reader as rfid_reader
-from hal import hal_lcd as hal_lcd  # fallback if g.lcd_queue not present
 
-_rfid = None
+RFID_WAIT_S = 1.0   # wake this often while waiting for a tap, to honour g.alarm_clear_event
+IR_BOUNCE_S = 0.03  # just past the HAL's 20 ms bouncetime
+
 _allowed_uids = None
 
-# Fallback LCD handle (only used if g.lcd_queue isn't available)
-_LCD = None
+# Trigger config bound once in init()/set_trigger() instead of per-call getattr
+_EDGE = "falling"
+_HOLD_S = 0.06
+
+_ir_irq = False   # True once IR edge detection is armed (see ir_irq_active())
 
 def init(allowed_uids=None):
     """One-time init. Pass allow-list; None = accept any UID."""
-    global _rfid, _allowed_uids, _LCD
+    global _allowed_uids, _ir_irq
 
-    try:
-        ir_sensor.init()
-    except Exception:
-        _dbg("IR init skipped/failed")
+    if not _ir_irq:  # init() may run more than once; arm the edge callback only once
+        try:
+            ir_sensor.init(_on_ir_edge)
+            _ir_irq = True
+        except Exception:
+            try:
+                ir_sensor.init()
+            except Exception:
+                _dbg("IR init skipped/failed")
 
     try:
         buzzer.init()
     except Exception:
         _dbg("Buzzer init skipped/failed")
 
-    try:
-        _rfid = rfid_reader.init()   # SimpleMFRC522
-    except Exception:
-        _rfid = None
+    if not g.start_rfid_reader():
         _dbg("RFID init failed (alarm cannot be cleared without RFID)")
 
-    # Prepare direct LCD fallback if no queue exists
-    if not hasattr(g, "lcd_queue"):
-        try:
-            _LCD = hal_lcd.lcd()
-        except Exception:
-            _LCD = None
-
     # Defaults (only if missing)
-    if not hasattr(g, "alarm_active"):
-        g.alarm_active = False
-    if not hasattr(g, "ir_last_state"):
-        g.ir_last_state = _read_ir()  # seed baseline (may be None)
+    if g.state.ir_last_state is None:
+        g.state.ir_last_state = _read_ir()  # seed baseline (may be None)
     if not hasattr(g, "alarm_debug"):
         g.alarm_debug = False
     # Default trigger = 'falling' so it works even if IR idles True
@@ -68,63 +66,37 @@ def init(allowed_uids=None):
         g.alarm_trigger_edge = "falling"   # 'rising' | 'falling' | 'any'
     if not hasattr(g, "alarm_ir_hold_ms"):
         g.alarm_ir_hold_ms = 60            # debounce/confirm duration (ms)
+    set_trigger(g.alarm_trigger_edge, g.alarm_ir_hold_ms)
 
     if allowed_uids is None and getattr(g, "rfid_allowed_uids", None) is not None:
         allowed_uids = g.rfid_allowed_uids
-    _allowed_uids = set(allowed_uids) if allowed_uids else None
+    # Canonical int UIDs only, so each tap is a single membership test
+    if allowed_uids:
+        _allowed_uids = normalize_uids(allowed_uids)
+    else:
+        _allowed_uids = None
+
+def set_trigger(edge="falling", hold_ms=60):
+    """Set IR trigger edge ('rising' | 'falling' | 'any') and confirm time (ms)."""
+    global _EDGE, _HOLD_S
+    g.alarm_trigger_edge = str(edge).lower()
+    g.alarm_ir_hold_ms = int(hold_ms)
+    _EDGE = g.alarm_trigger_edge
+    _HOLD_S = max(0, g.alarm_ir_hold_ms) / 1000.0
 
 def _dbg(msg):
-    if getattr(g, "alarm_debug", False):
+    if g.alarm_debug:
         print("[ALARM]", msg)
 
 # ---------------- LCD output helpers ----------------
-def _lcd_enqueue(line1="", line2="", hold_s=0.0, clear=True):
-    """
-    Prefer sending to a central LCD queue if g.lcd_queue exists.
-    Expected item format (keep simple & consistent with your display thread):
-        {"line1": str, "line2": str, "hold_s": float, "clear": bool}
-    """
-    item = {"line1": str(line1) if line1 is not None else "",
-            "line2": str(line2) if line2 is not None else "",
-            "hold_s": float(hold_s) if hold_s else 0.0,
-            "clear": bool(clear)}
-    try:
-        g.lcd_queue.put_nowait(item)
-        return True
-    except AttributeError:
-        # No queue present
-        return False
-    except queue.Full:
-        # Drop oldest and retry
-        try:
-            g.lcd_queue.get_nowait()
-        except Exception:
-            pass
-        try:
-            g.lcd_queue.put_nowait(item)
-            return True
-        except Exception:
-            return False
-
-def _lcd_direct(line1="", line2="", hold_s=0.0):
-    """Fallback: write directly using hal_lcd if queue isn't available."""
-    if _LCD is None:
-        return
+def _lcd(line1="", line2="", hold_s=0.0):
+    """Post a frame to the shared LCD worker, then hold if asked."""
     try:
-        _LCD.lcd_clear()
-        if line1:
-            _LCD.lcd_display_string(str(line1), 1)
-        if line2:
-            _LCD.lcd_display_string(str(line2), 2)
-        if hold_s > 0:
-            time.sleep(hold_s)
+        g.lcd_post(line1, line2)
     except Exception:
         pass
-
-def _lcd(line1="", line2="", hold_s=0.0):
-    """Unified LCD API for this module (queue first, then direct fallback)."""
-    if not _lcd_enqueue(line1, line2, hold_s, clear=True):
-        _lcd_direct(line1, line2, hold_s)
+    if hold_s > 0:
+        time.sleep(hold_s)
 
 # ---------------- Hardware helpers ----------------
 def _buzz(on: bool):
@@ -141,33 +113,41 @@ def _read_ir():
     except Exception:
         return None
 
+def _on_ir_edge(channel):
+    """GPIO edge callback: wake the IR watcher; monitor_ir_and_trigger() does the rest."""
+    g.wake_ir()
+    # bouncetime may swallow the final settling edge: have the sensor re-read
+    # once more after the bounce window has passed
+    threading.Timer(IR_BOUNCE_S, g.wake_ir).start()
+
+def ir_irq_active():
+    """True if IR edges are interrupt-driven (no periodic polling needed)."""
+    return _ir_irq
+
 def _edge_should_trigger(prev: bool, cur: bool) -> bool:
     """Return True iff transition prev->cur matches configured edge."""
-    edge = str(getattr(g, "alarm_trigger_edge", "falling")).lower()
-    if edge == "rising":
+    if _EDGE == "rising":
         return (prev is False) and (cur is True)
-    if edge == "falling":
+    if _EDGE == "falling":
         return (prev is True) and (cur is False)
     # "any"
     return prev != cur
 
 def _rfid_ok_blocking() -> bool:
-    """Block until a card is tapped. Return True if allowed (or open mode)."""
-    if _rfid is None:
+    """Wait up to RFID_WAIT_S for a card tap. Return True if allowed (or open mode)."""
+    if not g.rfid_reader_running:
         _lcd("RFID missing!", "Alarm locked", 1.0)
         return False
 
     _lcd("ALARM! Present", "RFID to clear", 0.1)
-    try:
-        uid = _rfid.read_id()  # BLOCKS until card tap
-        _dbg(f"RFID UID={uid}")
-    except Exception:
-        _lcd("RFID read error", "Try again", 0.8)
-        return False
+    uid = g.wait_rfid(timeout=RFID_WAIT_S)
+    if uid is None:
+        return False  # no tap yet; caller re-checks g.alarm_clear_event
+    _dbg(f"RFID UID={uid}")
 
     if _allowed_uids is None:
         return True
-    if uid in _allowed_uids or str(uid) in _allowed_uids:
+    if to_uid(uid) in _allowed_uids:
         return True
 
     _lcd("Access denied", f"UID:{uid}", 1.0)
@@ -176,16 +156,18 @@ def _rfid_ok_blocking() -> bool:
 # ---------------- Public API ----------------
 def monitor_ir_and_trigger():
     """
-    Call this frequently (e.g., each loop iteration).
-    If door is closed (g.locked True) AND the configured edge occurs,
+    Call this on every IR edge (see ir_irq_active()) or frequently from a loop,
+    and again once a pending edge's hold time has passed.
+    If door is closed (g.state.locked True) AND the configured edge occurs,
     trigger modal alarm.
     """
-    if getattr(g, "alarm_active", False):
+    if g.state.alarm_active:
         return
 
     # Only armed when the door is closed/locked
-    if not getattr(g, "locked", True):
-        g.ir_last_state = _read_ir()  # update baseline while unlocked
+    if not g.state.locked:
+        g.state.ir_last_state = _read_ir()  # update baseline while unlocked
+        g.state.ir_pending_edge = None
         return
 
     cur = _read_ir()
@@ -193,28 +175,42 @@ def monitor_ir_and_trigger():
         _dbg("IR read failed")
         return
 
-    prev = g.ir_last_state
+    # A candidate edge is waiting out its hold time: confirm or drop it
+    pending = g.state.ir_pending_edge
+    if pending is not None:
+        prev, edge_cur = pending
+        if cur != edge_cur:
+            # Bounced back before the hold elapsed -> noise
+            g.state.ir_pending_edge = None
+            g.state.ir_last_state = cur
+            return
+        if time.monotonic() < g.state.ir_pending_deadline:
+            return  # still holding; re-check on the next call
+        g.state.ir_pending_edge = None
+        _dbg(f"IR edge '{_EDGE}' confirmed: {prev} -> {cur}")
+        run_alarm_modal()
+        g.state.ir_last_state = cur
+        return
+
+    prev = g.state.ir_last_state
     if prev is None:
-        g.ir_last_state = cur
+        g.state.ir_last_state = cur
         return
 
-    # Trigger only on the configured edge (default: falling True->False)
+    # Trigger only on the configured edge (default: falling True->False).
+    # Debounce without sleeping: remember the edge and confirm it on a later call.
     if _edge_should_trigger(prev, cur):
-        hold_ms = int(getattr(g, "alarm_ir_hold_ms", 60))
-        time.sleep(max(0, hold_ms) / 1000.0)
-        confirm = _read_ir()
-        if confirm is not None and confirm == cur and _edge_should_trigger(prev, confirm):
-            _dbg(f"IR edge '{getattr(g,'alarm_trigger_edge','falling')}' confirmed: {prev} -> {cur}")
-            run_alarm_modal()
-            g.ir_last_state = cur
-            return
+        g.state.ir_pending_edge = (prev, cur)
+        g.state.ir_pending_deadline = time.monotonic() + _HOLD_S
+        return  # baseline stays at prev until confirmed
 
     # No trigger; update baseline
-    g.ir_last_state = cur
+    g.state.ir_last_state = cur
 
 def run_alarm_modal():
-    g.alarm_active = True
-    _buzz(True)
+    g.state.alarm_active = True
+    g.alarm_clear_event.clear()
+    _buzz(True)  # stays on until cleared; no need to re-assert
 
     # >>> NEW: turn camera on when alarm starts
     try:
@@ -225,11 +221,10 @@ def run_alarm_modal():
     _lcd("!!! ALARM !!!", "RFID required", 0.2)
 
     try:
-        while True:
+        # g.wait_rfid() blocks up to RFID_WAIT_S, so this loop re-checks g.alarm_clear_event that often
+        while not g.alarm_clear_event.is_set():
             if _rfid_ok_blocking():
                 break
-            _buzz(True)
-            time.sleep(0.1)
     finally:
         # >>> NEW: stop camera when alarm clears
         try:
@@ -238,7 +233,8 @@ def run_alarm_modal():
             _dbg(f"Camera stop failed: {e}")
 
         _buzz(False)
-        g.alarm_active = False
+        g.state.alarm_active = False
         _lcd("Alarm cleared", "", 0.8)
         _lcd()
-        g.return_to_main_menu = True
+        g.state.return_to_main_menu = True
+        g.post_event(g.EVT_ALARM_CLEARED)
@@ -2,51 +2,130 @@
 # Orchestrates keypad init, engine init, alarm init, boot flow, and calls F1_menu.
 
 import time
+import asyncio
 import threading
-import queue
 
 from hal import hal_keypad as keypad
+from hal import hal_buzzer as buzzer
 
-import g as g # shared: lcd, shared_keypad_queue
+import g as g # shared: lcd, ui_queue
 import F1_menu as F1
 
 from F3_4_start_stop_engine import (
     init as engine_init,
     ensure_switch_off_at_launch,
     enforce_switch_safety,
+    switch_irq_active,
     stop_engine,
     is_engine_running,
 )
 
 import F9_Intruder_detect as alarm
 
+# ---------- I2C clock check ----------
+I2C_CLOCK_NODE = "/sys/class/i2c-adapter/i2c-1/of_node/clock-frequency"
+
+def check_i2c_clock():
+    """
+    Warn if the LCD's I2C bus runs slower than g.i2c_clock_hz.
+    The bcm2835 I2C clock can't be changed at runtime, only via the boot dtparam.
+    Returns the current bus clock in Hz, or None if it can't be read.
+    """
+    try:
+        with open(I2C_CLOCK_NODE, "rb") as f:
+            hz = int.from_bytes(f.read(4), "big")  # device-tree u32, big-endian
+    except Exception:
+        return None
+    if hz < g.i2c_clock_hz:
+        print(f"I2C bus at {hz} Hz. For faster LCD updates add "
+              f"'dtparam=i2c_arm_baudrate={g.i2c_clock_hz}' to /boot/config.txt and reboot.")
+    return hz
+
 # ---------- Keypad ----------
 def key_pressed(k):
-    """HAL keypad callback — push key into the shared queue."""
-    k = str(k)
-    try:
-        g.shared_keypad_queue.put_nowait(k)
-    except queue.Full:
-        try:
-            g.shared_keypad_queue.get_nowait()
-        except queue.Empty:
-            pass
-        g.shared_keypad_queue.put_nowait(k)
+    """HAL keypad callback (scanner thread) — hand the key to the asyncio menu loop."""
+    g.post_key(str(k))
 
 def _scan_keys():
     """Blocking scanner that invokes the callback; run in a daemon thread."""
     keypad.get_key()
 
+# ---------- Supervisory tasks (asyncio) ----------
+SAFETY_PERIOD_S   = 0.2   # switch polling when edge detection is unavailable
+SAFETY_BACKSTOP_S = 0.5   # with edges armed: catches an OFF edge lost to bounce
+IR_PERIOD_S       = 0.1   # IR polling fallback when edge detection is unavailable
+IR_BACKSTOP_S     = 0.5   # with edges armed: catches a settled level whose edge was lost
+
+async def _safety_task():
+    """Stop the engine if the slide switch flips OFF (backstop to the GPIO edge callback)."""
+    period = SAFETY_BACKSTOP_S if switch_irq_active() else SAFETY_PERIOD_S
+    while True:
+        # Cheap and non-blocking (cached GPIO read), so it runs on the loop directly
+        if not enforce_switch_safety():
+            g.post_event(g.EVT_SAFETY_STOP)
+        await asyncio.sleep(period)
+
+async def _ir_task():
+    """Watch the IR sensor; the (blocking) alarm modal runs in the executor."""
+    while True:
+        await g.run_blocking(alarm.monitor_ir_and_trigger)
+        if g.state.ir_pending_edge is not None:
+            # Edge is waiting out its hold time: confirm it once that has passed
+            await asyncio.sleep(max(0.0, g.state.ir_pending_deadline - time.monotonic()))
+        elif alarm.ir_irq_active():
+            try:
+                await asyncio.wait_for(g.ir_wake.wait(), IR_BACKSTOP_S)  # next IR edge
+            except asyncio.TimeoutError:
+                pass
+            g.ir_wake.clear()
+        else:
+            await asyncio.sleep(IR_PERIOD_S)
+
+async def _keypad_dispatcher():
+    """Main-menu key handling; sleeps until a key or event arrives."""
+    while True:
+        key = await g.next_key()
+
+        if key == g.EVT_ALARM_CLEARED:
+            g.state.return_to_main_menu = False
+            F1.show_main_menu()
+            continue
+
+        if g.state.alarm_active:
+            continue  # stray key while alarm modal owns control
+
+        if key == '1':
+            await F1.idle_menu_loop()
+            F1.show_main_menu()
+
+        elif key == '2':
+            # Optional: allow quick Lock/Unlock from main menu
+            import F2_door as door
+            await g.run_blocking(door.toggle_lock)
+            await asyncio.sleep(0.4)
+            F1.show_main_menu()
+
+async def _supervise():
+    g.start_ui_queue()
+    try:
+        await asyncio.gather(_safety_task(), _ir_task(), _keypad_dispatcher())
+    finally:
+        # Ctrl-C cancels us; asyncio.run() then joins the executor, so unblock its jobs
+        g.request_shutdown()
+
 # ---------- Main ----------
 def main():
+    # LCD worker thread: sole owner of the I2C display from here on
+    g.start_lcd_worker()
+    check_i2c_clock()
+    # RFID reader thread: engine start and alarm clear both wait on g.wait_rfid()
+    g.start_rfid_reader()
+
     # Engine init — set allowed_uids to restrict, or None to accept any
     engine_init(require_rfid_each_start=True, allowed_uids=None)
 
-    # Alarm init — will use g.rfid_allowed_uids if present
-    try:
-        alarm.init(allowed_uids=g.rfid_allowed_uids)
-    except Exception:
-        alarm.init(allowed_uids=None)
+    # Door, sensors and alarm (alarm will use g.rfid_allowed_uids if present)
+    F1.bootstrap()
 
     # Keypad init and scanner thread
     keypad.init(key_pressed)
@@ -56,52 +135,33 @@ def main():
     ensure_switch_off_at_launch()
 
     # Boot text
-    g.lcd.lcd_clear()
-    g.lcd.lcd_display_string("System Ready", 1)
-    g.lcd.lcd_display_string("Press 1 to Start", 2)
+    g.lcd_post("System Ready", "Press 1 to Start")
     time.sleep(1.0)
 
     # Show main menu and wait for input
     F1.show_main_menu()
 
+    # uvloop is optional; the stdlib loop works the same, just with more per-await overhead
     try:
-        while True:
-            # Keep enforcing safety and watching alarm even on main menu
-            enforce_switch_safety()
-            alarm.monitor_ir_and_trigger()
-
-            if getattr(g, "alarm_active", False):
-                # Consume stray keys while alarm modal owns control
-                try:
-                    while True:
-                        g.shared_keypad_queue.get_nowait()
-                except queue.Empty:
-                    pass
-                time.sleep(0.05)
-                continue
-
-            try:
-                key = g.shared_keypad_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
-
-            if key == '1':
-                F1.idle_menu_loop()
-                F1.show_main_menu()
-
-            elif key == '2':
-                # Optional: allow quick Lock/Unlock from main menu
-                import F2_door as door
-                door.toggle_lock()
-                time.sleep(0.4)
-                F1.show_main_menu()
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
 
+    try:
+        asyncio.run(_supervise())
     except KeyboardInterrupt:
         try:
+            try:
+                buzzer.turn_off()
+            except Exception:
+                pass
             if is_engine_running():
                 stop_engine()
         finally:
-            g.lcd.lcd_clear()
+            # Through the worker, so the blank frame can't interleave with a draw in flight
+            g.lcd_post("", "")
+            g.stop_lcd_worker()
             print("Exiting.")
 
 if __name__ == "__main__":
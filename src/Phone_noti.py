@@ -3,8 +3,12 @@ from threading import Thread
 from picamera2 import Picamera2, Preview
 
 _picam2 = None
+_still_cfg = None  # full-res still configuration, built on first capture_still()
 _preview_mode = Preview.QTGL  # change to Preview.DRM or Preview.NULL if headless
 
+PREVIEW_SIZE = (640, 480)    # the only stream the alarm preview uses
+STILL_SIZE = (1920, 1080)
+
 def setup_camera():
     """
     Start Picamera2 preview & stream. Idempotent (safe to call multiple times).
@@ -15,11 +19,8 @@ def setup_camera():
         return _picam2
 
     cam = Picamera2()
-    cfg = cam.create_still_configuration(
-        main={"size": (1920, 1080)},
-        lores={"size": (640, 480)},
-        display="lores",
-    )
+    # Stream only at preview size; full-res buffers are used just for capture_still()
+    cfg = cam.create_preview_configuration(main={"size": PREVIEW_SIZE})
     cam.configure(cfg)
 
     # Try preferred preview; fall back if not available (e.g., headless)
@@ -35,9 +36,21 @@ def setup_camera():
     _picam2 = cam
     return _picam2
 
+def capture_still(path):
+    """
+    Save one full-resolution JPEG to path, then return to the preview stream.
+    Starts the camera if needed. Returns path.
+    """
+    global _still_cfg
+    cam = setup_camera()
+    if _still_cfg is None:
+        _still_cfg = cam.create_still_configuration(main={"size": STILL_SIZE})
+    cam.switch_mode_and_capture_file(_still_cfg, path)
+    return path
+
 def stop_camera():
     """Stop preview/stream and release the camera if it was started."""
-    global _picam2
+    global _picam2, _still_cfg
     if _picam2 is None:
         return
     try:
@@ -55,3 +68,4 @@ def stop_camera():
     except Exception:
         pass
     _picam2 = None
+    _still_cfg = None
@@ -2,25 +2,316 @@
 # Shared state for integrated_F1_F3_4, F1_menu, lock_unlock_door, check_sensors, alarm_system.
 # IMPORTANT: No blocking calls at import.
 
-import queue
+import time
+import asyncio
+import threading
 
 # ----------------------------
-# Keypad event queue
+# UI events for the asyncio menu loop: keypad keys plus the EVT_* tokens below.
+# Any thread posts with post_key()/post_event(); the loop awaits next_key().
+# Created by start_ui_queue() inside the running loop; posts before that are dropped.
 # ----------------------------
-shared_keypad_queue = queue.Queue(maxsize=64)
+EVT_SAFETY_STOP = "evt:safety-stop"      # engine stopped because the slide switch went OFF
+EVT_ALARM_CLEARED = "evt:alarm-cleared"  # alarm modal finished (see state.return_to_main_menu)
+_EVENTS = frozenset((EVT_SAFETY_STOP, EVT_ALARM_CLEARED))
+
+KEY_QUEUE_MAX = 64
+ui_loop = None    # asyncio loop that owns ui_queue
+ui_queue = None   # asyncio.Queue of keys/events
+ui_busy = None    # asyncio.Lock held while a blocking menu action runs
+ir_wake = None    # asyncio.Event set on every IR sensor edge (see wake_ir())
+
+def start_ui_queue():
+    """Create the UI queue/lock on the running loop. Call from a coroutine."""
+    global ui_loop, ui_queue, ui_busy, ir_wake
+    ui_loop = asyncio.get_running_loop()
+    ui_queue = asyncio.Queue(maxsize=KEY_QUEUE_MAX)
+    ui_busy = asyncio.Lock()
+    ir_wake = asyncio.Event()
+
+def _put_ui(item):
+    # Runs on the loop thread; drop the oldest entry when full
+    if ui_queue.full():
+        ui_queue.get_nowait()
+    ui_queue.put_nowait(item)
+
+def post_key(key):
+    """Thread-safe: queue a key (or EVT_* token) for the menu loop."""
+    loop = ui_loop
+    if loop is None:
+        return
+    try:
+        loop.call_soon_threadsafe(_put_ui, key)
+    except RuntimeError:
+        pass  # loop already closed (shutdown)
+
+post_event = post_key
+
+def wake_ir():
+    """Thread-safe: wake the IR watcher task (called from the GPIO edge callback)."""
+    loop = ui_loop
+    if loop is None:
+        return
+    try:
+        loop.call_soon_threadsafe(ir_wake.set)
+    except RuntimeError:
+        pass  # loop already closed (shutdown)
+
+async def next_key():
+    """Await the next key or EVT_* token."""
+    return await ui_queue.get()
+
+async def run_blocking(fn, *args):
+    """Run a blocking HAL/menu call in the default executor while holding ui_busy."""
+    async with ui_busy:
+        return await ui_loop.run_in_executor(None, fn, *args)
+
+# asyncio.run() waits for executor jobs on exit, so blocking actions must
+# return once shutdown is requested (checked by the alarm modal and the waits)
+shutdown_event = threading.Event()
+
+def request_shutdown():
+    """Thread-safe: make the alarm modal and RFID/switch waits return promptly."""
+    shutdown_event.set()
+    alarm_clear_event.set()
+    with _rfid_cv:
+        _rfid_cv.notify_all()
+
+def drain_keys():
+    """Discard pending keys; EVT_* tokens stay queued. Call from the loop thread."""
+    # Loop-thread only, so no locking: one pass over what is queued right now
+    for _ in range(ui_queue.qsize()):
+        item = ui_queue.get_nowait()
+        if item in _EVENTS:
+            ui_queue.put_nowait(item)
+
+# ----------------------------
+# Hot mutable state, read/written on every loop tick. Kept on one __slots__
+# object (fixed slot offsets, no per-instance dict): use g.state.<name>.
+# ----------------------------
+class _State:
+    __slots__ = (
+        "locked", "last_servo_angle", "alarm_active", "return_to_main_menu",
+        "ir_last_state", "ir_pending_edge", "ir_pending_deadline",
+        "last_rfid_uid", "last_rfid_ts",
+        "last_temp", "last_humid", "last_temp_ts",
+        "last_light", "last_light_ts", "last_rain",
+    )
+
+    def __init__(self):
+        # Door (used by lock_unlock_door)
+        self.locked = True               # True = locked/closed door, False = unlocked/open
+        self.last_servo_angle = None     # last angle commanded to the servo (None = unknown)
+        # Alarm (used by alarm_system)
+        self.alarm_active = False        # True when alarm modal is running
+        self.return_to_main_menu = False
+        self.ir_last_state = None        # last IR boolean state (True/False)
+        self.ir_pending_edge = None      # (prev, cur) IR edge waiting out alarm_ir_hold_ms
+        self.ir_pending_deadline = 0.0   # time.monotonic() when the pending edge is confirmed
+        # RFID (published by the shared reader daemon)
+        self.last_rfid_uid = None        # int UID of the most recent tap
+        self.last_rfid_ts = 0.0          # time.monotonic() of that tap
+        # Sensors last readings (used by check_sensors)
+        self.last_temp = None            # float or None
+        self.last_humid = None           # float or None
+        self.last_temp_ts = 0.0          # time.monotonic() of last valid temp/humid (0 = never)
+        self.last_light = None           # int   or None
+        self.last_light_ts = 0.0         # time.monotonic() when last_light was read
+        self.last_rain = None            # bool  or None (True=raining)
+
+state = _State()
 
 # ----------------------------
 # LCD (shared). Safe no-op fallback if HAL isn't available.
 # ----------------------------
 try:
     from hal import hal_lcd as LCD
-    lcd = LCD.lcd()
+    _lcd_dev = LCD.lcd()
 except Exception:
     class _NoOpLCD:
         def lcd_clear(self): pass
         def lcd_display_string(self, *args, **kwargs): pass
-    lcd = _NoOpLCD()
+        def lcd_write_screen(self, *args, **kwargs): pass
+    _lcd_dev = _NoOpLCD()
+
+# Last (line1, line2) drawn via lcd.lcd_lines(); None = unknown (raw write happened)
+_lcd_last = ("", "")
+
+class _TrackedLCD:
+    """Wraps the shared LCD so lcd_lines() skips frames identical to the last one."""
+    def __init__(self, dev):
+        self._dev = dev
+
+    def __getattr__(self, name):
+        return getattr(self._dev, name)
+
+    def lcd_clear(self):
+        global _lcd_last
+        self._dev.lcd_clear()
+        _lcd_last = ("", "")
 
+    def lcd_display_string(self, string, line=1, pos=0):
+        global _lcd_last
+        self._dev.lcd_display_string(string, line, pos)
+        _lcd_last = None
+
+    def lcd_lines(self, line1="", line2=""):
+        global _lcd_last
+        new = (_lcd_text(line1), _lcd_text(line2))
+        last = _lcd_last
+        if new != last:
+            # One I2C burst; the HAL shadow only sends the changed columns
+            self._dev.lcd_write_screen(new[0], new[1])
+        _lcd_last = new
+
+lcd = _TrackedLCD(_lcd_dev)
+
+def _lcd_text(v):
+    """LCD line as given: str/bytes pass through (bytes = pre-padded labels), None -> ""."""
+    if v is None:
+        return ""
+    return v if isinstance(v, (str, bytes)) else str(v)
+
+# ----------------------------
+# LCD frame slot. A single worker thread owns the I2C display; lcd_post()
+# drops its frame into a one-frame slot (replacing any frame not drawn yet),
+# so callers never block on I2C and a burst collapses to the newest frame.
+# ----------------------------
+_lcd_pending = None               # (line1, line2) waiting to be drawn, or None
+_lcd_cv = threading.Condition()
+_lcd_stop = False
+_lcd_thread = None
+lcd_worker_running = False
+
+def _lcd_worker():
+    global _lcd_pending
+    while True:
+        with _lcd_cv:
+            _lcd_cv.wait_for(lambda: _lcd_pending is not None or _lcd_stop)
+            frame, _lcd_pending = _lcd_pending, None
+            stopping = _lcd_stop
+        if frame is not None:
+            try:
+                lcd.lcd_lines(*frame)
+            except Exception:
+                pass
+        if stopping:
+            return
+
+def start_lcd_worker():
+    """Start the LCD worker (daemon). Call once at program startup."""
+    global lcd_worker_running, _lcd_thread
+    if lcd_worker_running:
+        return
+    lcd_worker_running = True
+    _lcd_thread = threading.Thread(target=_lcd_worker, daemon=True)
+    _lcd_thread.start()
+
+def stop_lcd_worker(timeout=1.0):
+    """Draw the pending frame (if any), then stop the LCD worker and wait for it to exit."""
+    global lcd_worker_running, _lcd_stop
+    if not lcd_worker_running:
+        return
+    with _lcd_cv:
+        _lcd_stop = True
+        _lcd_cv.notify()
+    _lcd_thread.join(timeout)
+    if not _lcd_thread.is_alive():
+        lcd_worker_running = False  # lcd_post() draws directly from here on
+
+def lcd_post(line1="", line2=""):
+    """Post a 2-line frame for the LCD worker; draws directly if no worker is running."""
+    global _lcd_pending
+    frame = (_lcd_text(line1), _lcd_text(line2))
+    if not lcd_worker_running:
+        lcd.lcd_lines(*frame)
+        return
+    with _lcd_cv:
+        _lcd_pending = frame   # replaces a frame the worker hasn't picked up yet
+        _lcd_cv.notify()
+
+
+# ----------------------------
+# RFID: one shared reader + daemon thread. Each tap is published to
+# state.last_rfid_uid and bumps _rfid_seq; consumers call wait_rfid().
+# The daemon only polls the SPI bus while somebody is waiting. If the reader's
+# IRQ line is wired (and passes the self-test) it sleeps on that instead of
+# polling read_id_no_block(); otherwise it polls every RFID_POLL_S.
+# ----------------------------
+RFID_POLL_S = 0.05
+# BCM pin wired to the MFRC522 IRQ line, or None to always poll. None by default:
+# every free GPIO on this board is taken by a HAL (21 is the DHT11) except the
+# UART pair 14/15; set it only once IRQ is wired to a pin nothing else uses.
+RFID_IRQ_PIN = None
+rfid_wanted = threading.Event()   # set while at least one thread is in wait_rfid()
+rfid_reader_running = False
+_rfid_lock = threading.Lock()
+_rfid_cv = threading.Condition()
+_rfid_seq = 0                     # bumped on every tap
+_rfid_waiters = 0
+
+def _rfid_loop(reader):
+    global _rfid_seq
+    while True:
+        rfid_wanted.wait()
+        try:
+            if not reader.irq_enabled:
+                uid = reader.read_id_no_block()
+            elif reader.wait_for_tag(RFID_POLL_S):
+                # That REQA already moved the card to READY; a second REQIDL would go unanswered
+                uid = reader.read_id_after_request()
+            else:
+                continue  # no card answered; the REQA/IRQ wait was the sleep
+        except Exception:
+            uid = None
+        if uid:
+            with _rfid_cv:
+                state.last_rfid_uid = uid
+                state.last_rfid_ts = time.monotonic()
+                _rfid_seq += 1
+                _rfid_cv.notify_all()
+        time.sleep(RFID_POLL_S)
+
+def start_rfid_reader():
+    """Create the shared RFID reader and start its daemon (once). Returns True if running."""
+    global rfid_reader_running
+    with _rfid_lock:
+        if rfid_reader_running:
+            return True
+        try:
+            from hal import hal_rfid_reader
+            reader = hal_rfid_reader.init(RFID_IRQ_PIN)   # SimpleMFRC522
+        except Exception:
+            return False
+        rfid_reader_running = True
+    threading.Thread(target=_rfid_loop, args=(reader,), daemon=True).start()
+    return True
+
+def wait_rfid(timeout=None):
+    """Block until the next RFID tap or timeout (None = forever). Returns the UID, or None."""
+    global _rfid_waiters
+    if shutdown_event.is_set() or not start_rfid_reader():
+        return None
+    with _rfid_cv:
+        seq = _rfid_seq
+        _rfid_waiters += 1
+        rfid_wanted.set()
+        try:
+            _rfid_cv.wait_for(lambda: _rfid_seq != seq or shutdown_event.is_set(), timeout)
+            if _rfid_seq == seq:
+                return None  # timed out, or shutting down
+            return state.last_rfid_uid
+        finally:
+            _rfid_waiters -= 1
+            if _rfid_waiters == 0:
+                rfid_wanted.clear()
+
+# ----------------------------
+# I2C bus clock wanted for the LCD (PCF8574 -> HD44780 writes are bus-bound).
+# Raspberry Pi default is 100 kHz and is fixed at boot; raise it with
+#   dtparam=i2c_arm_baudrate=400000   in /boot/config.txt (reboot required)
+# ----------------------------
+i2c_clock_hz = 400000
 
 # >>> Set the project’s allowed RFID tags here <<<
 rfid_allowed_uids = [966206689390, 470912245720, 988692462534]
@@ -38,7 +329,6 @@ PAGES = len(idle_menu)
 # ----------------------------
 # Door lock shared defaults (used by lock_unlock_door)
 # ----------------------------
-locked = True        # True = locked/closed door, False = unlocked/open
 lock_angle = 0.0     # degrees [0..180]
 unlock_angle = 90.0  # degrees [0..180]
 
@@ -47,19 +337,13 @@ unlock_angle = 90.0  # degrees [0..180]
 # ----------------------------
 sensors_dark_threshold = 500   # MCP3008: 0..1023
 sensors_light_channel  = 0     # MCP3008 channel (0..7)
-last_temp  = None              # float or None
-last_humid = None              # float or None
-last_light = None              # int   or None
-last_rain  = None              # bool  or None (True=raining)
 
 # ----------------------------
 # Alarm system shared flags (used by alarm_system)
 # ----------------------------
-alarm_active  = False          # True when alarm modal is running
-ir_last_state = None           # last IR boolean state (True/False)
 rfid_allowed_uids = None       # e.g., ["12345", 67890]; None = accept any
 alarm_debug = False            # set True to print alarm debug
-return_to_main_menu = False
+alarm_clear_event = threading.Event()  # set() to cancel the alarm modal externally
 
 # ----------------------------
 # Misc flags (optional)
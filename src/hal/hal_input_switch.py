@@ -1,16 +1,22 @@
 import RPi.GPIO as GPIO #import RPi.GPIO module
 from time import sleep
 
-def init():
+SWITCH_PIN = 22 #BCM pin of the slide switch
+
+def init(cbk=None):
     GPIO.setmode(GPIO.BCM) #choose BCM mode
     GPIO.setwarnings(False)
-    GPIO.setup(22,GPIO.IN) #set GPIO 22 as input
+    GPIO.setup(SWITCH_PIN,GPIO.IN) #set GPIO 22 as input
+
+    #optional: call cbk(channel) on every edge (runs in RPi.GPIO's callback thread)
+    if cbk is not None:
+        GPIO.add_event_detect(SWITCH_PIN, GPIO.BOTH, callback=cbk, bouncetime=20)
 
 
 def read_slide_switch():
     ret = 0
 
-    if GPIO.input(22):
+    if GPIO.input(SWITCH_PIN):
         ret = 1
 
     return ret
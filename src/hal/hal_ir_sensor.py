@@ -1,11 +1,17 @@
 
 import RPi.GPIO as GPIO
 
-def init():
+IR_PIN = 17 #BCM pin of the IR sensor
+
+def init(cbk=None):
     GPIO.setmode(GPIO.BCM) #choose BCM mode
     GPIO.setwarnings(False)
 
-    GPIO.setup(17, GPIO.IN)  # set GPIO 17 as input
+    GPIO.setup(IR_PIN, GPIO.IN)  # set GPIO 17 as input
+
+    #optional: call cbk(channel) on every edge (runs in RPi.GPIO's callback thread)
+    if cbk is not None:
+        GPIO.add_event_detect(IR_PIN, GPIO.BOTH, callback=cbk, bouncetime=20)
 
 
 def get_ir_sensor_state():
@@ -13,7 +19,7 @@ def get_ir_sensor_state():
     ret = False
 
     # Object is detected
-    if GPIO.input(17) == 0:
+    if GPIO.input(IR_PIN) == 0:
         ret = True
 
     return ret
@@ -21,29 +21,48 @@ I2CBUS = 1
 # LCD Address
 ADDRESS = 0x27
 
-import smbus
+try:
+    from smbus2 import SMBus, i2c_msg  # whole-screen bursts in one I2C transaction
+except ImportError:
+    from smbus import SMBus
+    i2c_msg = None
 from time import sleep
 
+# Max bytes per transaction on the plain smbus fallback (SMBus block limit)
+I2C_BLOCK_MAX = 32
+
+# Visible geometry (16x2) and DDRAM start address of each line
+LCD_WIDTH = 16
+LINE_ADDR = (0x00, 0x40)
+
 
 class i2c_device:
     def __init__(self, addr, port=I2CBUS):
         self.addr = addr
-        self.bus = smbus.SMBus(port)
+        self.bus = SMBus(port)
 
     # Write a single command
+    # (no settle sleeps: one I2C byte takes longer than any HD44780 timing
+    # except clear/home, and lcd_clear() waits for those itself)
     def write_cmd(self, cmd):
         self.bus.write_byte(self.addr, cmd)
-        sleep(0.0001)
 
     # Write a command and argument
     def write_cmd_arg(self, cmd, data):
         self.bus.write_byte_data(self.addr, cmd, data)
-        sleep(0.0001)
 
     # Write a block of data
     def write_block_data(self, cmd, data):
         self.bus.write_block_data(self.addr, cmd, data)
-        sleep(0.0001)
+
+    # Write a raw byte stream to the expander in as few transactions as possible
+    def write_bytes(self, data):
+        if i2c_msg is not None:
+            self.bus.i2c_rdwr(i2c_msg.write(self.addr, bytes(data)))
+            return
+        for i in range(0, len(data), I2C_BLOCK_MAX + 1):
+            chunk = data[i:i + I2C_BLOCK_MAX + 1]
+            self.bus.write_i2c_block_data(self.addr, chunk[0], list(chunk[1:]))
 
     # Read a single byte
     def read(self):
@@ -111,22 +130,26 @@ class lcd:
         self.lcd_device = i2c_device(ADDRESS)
 
         self.lcd_write(0x03)
+        sleep(0.005)
         self.lcd_write(0x03)
+        sleep(0.001)
         self.lcd_write(0x03)
         self.lcd_write(0x02)
 
         self.lcd_write(LCD_FUNCTIONSET | LCD_2LINE | LCD_5x8DOTS | LCD_4BITMODE)
         self.lcd_write(LCD_DISPLAYCONTROL | LCD_DISPLAYON)
         self.lcd_write(LCD_CLEARDISPLAY)
+        sleep(0.002)
         self.lcd_write(LCD_ENTRYMODESET | LCD_ENTRYLEFT)
         sleep(0.2)
 
+        # What lines 1-2 currently show; writes only send the columns that differ
+        self._shadow = [bytearray(b' ' * LCD_WIDTH) for _ in LINE_ADDR]
+
     # clocks EN to latch command
     def lcd_strobe(self, data):
         self.lcd_device.write_cmd(data | En | LCD_BACKLIGHT)
-        sleep(.0005)
         self.lcd_device.write_cmd(((data & ~En) | LCD_BACKLIGHT))
-        sleep(.0001)
 
     def lcd_write_four_bits(self, data):
         self.lcd_device.write_cmd(data | LCD_BACKLIGHT)
@@ -143,8 +166,34 @@ class lcd:
         self.lcd_write_four_bits(mode | (charvalue & 0xF0))
         self.lcd_write_four_bits(mode | ((charvalue << 4) & 0xF0))
 
+    # append writes for the changed column run of line 1/2 after placing
+    # string at pos, then update the shadow. Columns past LCD_WIDTH are dropped.
+    # bytes are taken as ready-made character codes (no per-char conversion).
+    def _pack_line_diff(self, buf, line, string, pos=0):
+        shadow = self._shadow[line - 1]
+        new = bytearray(shadow)
+        if not isinstance(string, bytes):
+            string = bytes(ord(char) & 0xFF for char in string)
+        new[pos:pos + len(string)] = string
+        del new[LCD_WIDTH:]
+        changed = [i for i in range(LCD_WIDTH) if new[i] != shadow[i]]
+        if not changed:
+            return
+        lo, hi = changed[0], changed[-1]
+        self._pack_write(buf, LCD_SETDDRAMADDR | (LINE_ADDR[line - 1] + lo))
+        for value in new[lo:hi + 1]:
+            self._pack_write(buf, value, Rs)
+        shadow[:] = new
+
     # put string function with optional char positioning
     def lcd_display_string(self, string, line=1, pos=0):
+        if line in (1, 2):
+            buf = bytearray()
+            self._pack_line_diff(buf, line, string, pos)
+            if buf:
+                self.lcd_device.write_bytes(buf)
+            return
+
         if line == 1:
             pos_new = pos
         elif line == 2:
@@ -159,10 +208,29 @@ class lcd:
         for char in string:
             self.lcd_write(ord(char), Rs)
 
+    # append the expander bytes for one 8-bit write (two strobed nibbles) to buf
+    def _pack_write(self, buf, value, mode=0):
+        for nibble in (value & 0xF0, (value << 4) & 0xF0):
+            data = mode | nibble | LCD_BACKLIGHT
+            buf += bytes((data, data | En, data))
+
+    # write both lines (padded/cut to 16 chars) in one I2C burst; no clear needed.
+    # Only changed columns are sent. Lines may be str or bytes (e.g. labels
+    # pre-padded to 16). Pass None for a line to leave it as it is.
+    def lcd_write_screen(self, line1, line2=None):
+        buf = bytearray()
+        for line, text in ((1, line1), (2, line2)):
+            if text is not None:
+                self._pack_line_diff(buf, line, text[:LCD_WIDTH].ljust(LCD_WIDTH))
+        if buf:
+            self.lcd_device.write_bytes(buf)
+
     # clear lcd and set to home
     def lcd_clear(self):
-        self.lcd_write(LCD_CLEARDISPLAY)
-        self.lcd_write(LCD_RETURNHOME)
+        self.lcd_write(LCD_CLEARDISPLAY)  # also homes the cursor (DDRAM address 0)
+        sleep(0.002)  # clear takes ~1.5 ms on the HD44780; no commands until it is done
+        for shadow in self._shadow:
+            shadow[:] = b' ' * LCD_WIDTH
 
     # define backlight on/off (lcd.backlight(1); off= lcd.backlight(0)
     def backlight(self, state):  # for state, 1 = on, 0 = off
@@ -25,6 +25,7 @@ import RPi.GPIO as GPIO
 import spi
 import signal
 import time
+import threading
 
 class MFRC522:
   NRSTPD = 11
@@ -402,6 +403,49 @@ class MFRC522:
             print ("Authentication error")
         i = i+1
 
+  def MFRC522_IrqInit(self, pin):
+    # IRQ pin is open drain, active low (IRqInv): wake self.irq on the falling edge
+    self.irq = threading.Event()
+    GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.add_event_detect(pin, GPIO.FALLING, callback=lambda ch: self.irq.set())
+
+  def MFRC522_IrqSelfTest(self, timeout=0.1):
+    # Fire the timer IRQ once; False if no edge arrives (IRQ line not wired)
+    self.irq.clear()
+    self.Write_MFRC522(self.CommIrqReg, 0x7F)
+    self.Write_MFRC522(self.CommIEnReg, 0x81)  # IRqInv | TimerIEn
+    self.SetBitMask(self.ControlReg, 0x40)     # TStartNow
+    ok = self.irq.wait(timeout)
+    self.Write_MFRC522(self.CommIEnReg, 0x80)
+    self.Write_MFRC522(self.CommIrqReg, 0x7F)
+    return ok
+
+  def MFRC522_WaitForTag(self, timeout):
+    # Send one REQA and sleep until a card's answer raises RxIRq (or timeout)
+    self.irq.clear()
+    self.Write_MFRC522(self.CommIrqReg, 0x7F)
+    self.Write_MFRC522(self.CommIEnReg, 0xA0)  # IRqInv | RxIEn
+    self.SetBitMask(self.FIFOLevelReg, 0x80)
+    self.Write_MFRC522(self.FIFODataReg, self.PICC_REQIDL)
+    self.Write_MFRC522(self.CommandReg, self.PCD_TRANSCEIVE)
+    self.Write_MFRC522(self.BitFramingReg, 0x87)  # StartSend, 7 bits
+    found = self.irq.wait(timeout)
+    self.Write_MFRC522(self.CommandReg, self.PCD_IDLE)
+    self.Write_MFRC522(self.CommIEnReg, 0x80)
+    self.Write_MFRC522(self.CommIrqReg, 0x7F)
+    return found
+
+  def MFRC522_RequestResult(self):
+    # Check the ATQA that MFRC522_WaitForTag's REQA left in the FIFO; same result as MFRC522_Request
+    status = self.MI_ERR
+    n = self.Read_MFRC522(self.FIFOLevelReg)
+    lastBits = self.Read_MFRC522(self.ControlReg) & 0x07
+    backBits = (n-1)*8 + lastBits if lastBits != 0 else n*8
+    if (self.Read_MFRC522(self.ErrorReg) & 0x1B) == 0x00 and backBits == 0x10:
+      status = self.MI_OK
+    self.SetBitMask(self.FIFOLevelReg, 0x80)
+    return (status,backBits)
+
   def MFRC522_Init(self):
     #GPIO.output(17, 1)
 
@@ -428,6 +472,30 @@ class SimpleMFRC522:
 
     def __init__(self):
         self.READER = MFRC522()
+        self.irq_enabled = False
+
+    def enable_irq(self, pin):
+        """Use the MFRC522 IRQ line on BCM `pin`. Returns False (and keeps polling) if it doesn't fire."""
+        self.READER.MFRC522_IrqInit(pin)
+        if not self.READER.MFRC522_IrqSelfTest():
+            GPIO.remove_event_detect(pin)
+            return False
+        self.irq_enabled = True
+        return True
+
+    def wait_for_tag(self, timeout):
+        """Sleep until a card answers (IRQ) or timeout; True if one did. Needs enable_irq()."""
+        return self.READER.MFRC522_WaitForTag(timeout)
+
+    def read_id_after_request(self):
+        """Like read_id_no_block(), after wait_for_tag() returned True (the card already answered REQA)."""
+        (status, backBits) = self.READER.MFRC522_RequestResult()
+        if status != self.READER.MI_OK:
+            return None
+        (status, uid) = self.READER.MFRC522_Anticoll()
+        if status != self.READER.MI_OK:
+            return None
+        return self.uid_to_num(uid)
 
     def read(self):
         id, text = self.read_no_block()
@@ -506,7 +574,9 @@ class SimpleMFRC522:
         return n
 
 
-def init():
+def init(irq_pin=None):
     rfid_reader = SimpleMFRC522()
+    if irq_pin is not None:
+        rfid_reader.enable_irq(irq_pin)
 
     return rfid_reader
\ No newline at end of file
@@ -18,7 +18,7 @@ from hal import hal_dc_motor as dc_motor
 from hal import hal_accelerometer as accel
 
 #Empty list to store sequence of keypad presses
-shared_keypad_queue = queue.Queue()
+shared_keypad_queue = queue.SimpleQueue()
 
 
 
@@ -1,20 +1,44 @@
+import os
+
 import mysql.connector
+import mysql.connector.pooling
 from mysql.connector import Error
 
-DB_HOST = "172.23.39.165"
-DB_USER = "pi_user"
-DB_PASSWORD = "mypi123"
-DB_NAME = "DovOps"
+# Override with environment variables to point at a test database
+DB_HOST = os.environ.get("DB_HOST", "172.23.39.165")
+DB_USER = os.environ.get("DB_USER", "pi_user")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "mypi123")
+DB_NAME = os.environ.get("DB_NAME", "DovOps")
+POOL_SIZE = 4
+
+# Fixed SQL, built once. Column names for updates come from USER_FIELDS only.
+USER_FIELDS = ("RFID", "Username", "Password", "Phone", "Name", "LockPassword")
+SQL_ADD_CHECK = ("SELECT COUNT(*) AS total, "
+                 "COALESCE(SUM(RFID=%s OR Username=%s), 0) AS dup FROM users")
+SQL_INSERT = ("INSERT INTO users (RFID, Username, Password, Phone, Name, LockPassword) "
+              "VALUES (%s,%s,%s,%s,%s,%s)")
+SQL_FIND = "SELECT * FROM users WHERE Username=%s"
+SQL_DELETE = "DELETE FROM users WHERE Username=%s"
+SQL_UPDATE = {f: f"UPDATE users SET `{f}`=%s WHERE Username=%s" for f in USER_FIELDS}
+
+# Connections are reused from this pool (created on first use);
+# conn.close() hands a connection back instead of closing it.
+_pool = None
 
 def get_connection():
+    global _pool
     try:
-        return mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            autocommit=False,
-        )
+        if _pool is None:
+            _pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name="dovops",
+                pool_size=POOL_SIZE,
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                database=DB_NAME,
+                autocommit=False,
+            )
+        return _pool.get_connection()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
@@ -25,22 +49,19 @@ def add_user(rfid, username, password, phone, name, lock_password):
         return False
     try:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT COUNT(*) AS total FROM users")
-            if cur.fetchone()["total"] >= 3:
+            # One round-trip for both the user limit and the duplicate check
+            cur.execute(SQL_ADD_CHECK, (rfid, username))
+            row = cur.fetchone()
+            if row["total"] >= 3:
                 print("User limit reached. Cannot add more than 3 users.")
                 return False
 
-            cur.execute(
-                "SELECT 1 FROM users WHERE RFID=%s OR Username=%s",
-                (rfid, username),
-            )
-            if cur.fetchone():
+            if row["dup"]:
                 print("User already exists.")
                 return False
 
             cur.execute(
-                "INSERT INTO users (RFID, Username, Password, Phone, Name, LockPassword) "
-                "VALUES (%s,%s,%s,%s,%s,%s)",
+                SQL_INSERT,
                 (rfid, username, password, phone, name, lock_password),
             )
         conn.commit()
@@ -58,7 +79,7 @@ def find_user_by_username(username):
         return None
     try:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM users WHERE Username=%s", (username,))
+            cur.execute(SQL_FIND, (username,))
             return cur.fetchone()
     except Error as e:
         print(f"Find failed: {e}")
@@ -67,8 +88,8 @@ def find_user_by_username(username):
         conn.close()
 
 def update_user_field(username, field, new_value):
-    allowed = {"RFID","Username","Password","Phone","Name","LockPassword"}
-    if field not in allowed:
+    sql = SQL_UPDATE.get(field)
+    if sql is None:
         print("Invalid field.")
         return False
     conn = get_connection()
@@ -76,9 +97,7 @@ def update_user_field(username, field, new_value):
         return False
     try:
         with conn.cursor() as cur:
-            # backtick the column name that we already validated
-            cur.execute(f"UPDATE users SET `{field}`=%s WHERE Username=%s",
-                        (new_value, username))
+            cur.execute(sql, (new_value, username))
         conn.commit()
         return cur.rowcount > 0
     except Error as e:
@@ -89,8 +108,7 @@ def update_user_field(username, field, new_value):
         conn.close()
 
 def get_user_field(username, field):
-    allowed = {"RFID","Username","Password","Phone","Name","LockPassword"}
-    if field not in allowed:
+    if field not in USER_FIELDS:
         print("Invalid field.")
         return None
     user = find_user_by_username(username)
@@ -102,7 +120,7 @@ def delete_user(username):
         return False
     try:
         with conn.cursor() as cur:
-            cur.execute("DELETE FROM users WHERE Username=%s", (username,))
+            cur.execute(SQL_DELETE, (username,))
         conn.commit()
         if cur.rowcount > 0:
             print(f"User '{username}' has been deleted.")
@@ -117,9 +135,10 @@ def delete_user(username):
     finally:
         conn.close()
 
-print(find_user_by_username("alice"))              # None if not present
-print(add_user("123456", "alice", "pw", "999", "Alice", "1234"))
-print(find_user_by_username("alice"))              # now a dict
-print(get_user_field("alice", "Phone"))            # "999"
-print(update_user_field("alice", "Phone", "888"))
-print(delete_user("alice"))
+if __name__ == "__main__":
+    print(find_user_by_username("alice"))              # None if not present
+    print(add_user("123456", "alice", "pw", "999", "Alice", "1234"))
+    print(find_user_by_username("alice"))              # now a dict
+    print(get_user_field("alice", "Phone"))            # "999"
+    print(update_user_field("alice", "Phone", "888"))
+    print(delete_user("alice"))